@@ -0,0 +1,349 @@
+import asyncio
+import serial
+from serial_asyncio_fast import open_serial_connection
+from typing import Iterable, Union
+
+from py_mac.MAC50Motor import MAC50Motor, OperatingMode, Register, _CONFIG_FIELDS, _CONFIG_READ_PLAN, _READ_HEADER, _READ_RESPONSE_LENGTH, _RESYNC_TIMEOUT, _SIZE, _STRUCTS, _USB_LATENCY, _WRITE_ACK, _answer_timeout, _decode_reads, _mode_from, _operating_mode, _plan_reads
+
+class _SharedStreams:
+    def __init__(self, serial_path: str, baud: int):
+        """
+        Asyncio streams of a serial port shared by all the async motors on the same bus, along with their lock, like
+        `_SharedPort`. The answers only carry the address of the master, so two motors talking on the same bus at the
+        same time could take each other's answers.
+
+        :param serial_path: Path to the serial port
+        :param baud: Speed of the serial port, in bits per second
+        """
+        # opened once, the motors opened meanwhile wait for the same (reader, writer) pair
+        self.opened = asyncio.ensure_future(open_serial_connection(url=serial_path, baudrate=baud))
+        self.lock = asyncio.Lock() # guards the request/response sequences on the wire
+        self.users = 0
+
+class AsyncMAC50Motor(MAC50Motor):
+    """
+    MAC50Motor talking to the motor through asyncio streams instead of a serial thread, so that the motors on different
+    buses can be refreshed concurrently with `asyncio.gather`. Requests to a single motor are still sent one at a time.
+    Only the coroutine methods, prefixed with `a`, talk to the motor: the blocking and fire-and-forget methods of
+    MAC50Motor, `close` and the `with` statement raise TypeError. Use `aclose` or `async with` instead.
+    """
+    # Streams currently opened, by path, shared by the motors of a bus like `MAC50Motor._open_ports`
+    _open_streams = {}
+
+    def __init__(self, serial_path: str, address: int):
+        """
+        Create a new AsyncMAC50Motor object, without opening the serial port. Use `AsyncMAC50Motor.open` instead.
+
+        :param serial_path: Path to the serial port
+        :param address: Address of the motor
+        """
+        self._setup(serial_path, address)
+        # there is no pyserial port to expose, the port is only reached through `_reader` and `_writer`
+        self.serial = None
+        # the low latency mode of the adapter can't be set through the asyncio streams, see `_answer_timeout`
+        self._latency = _USB_LATENCY
+        self._streams = None
+        self._reader = None
+        self._writer = None
+        # guards the request/response sequences on the wire, shared by all the motors of the bus once opened
+        self._bus_lock = None
+        # serializes the updates of `self.status` with the exchanges they come from, like `MAC50Motor._status_lock`, and
+        # taken before `_bus_lock`
+        self._astatus_lock = asyncio.Lock()
+
+    @classmethod
+    async def open(cls, serial_path: str, address: int)->'AsyncMAC50Motor':
+        """
+        Open the serial port and create a new AsyncMAC50Motor object matching the motor.
+
+        :param serial_path: Path to the serial port
+        :param address: Address of the motor
+        :return: the motor
+        """
+        motor = cls(serial_path, address)
+        # Open the serial port, or reuse it if another motor on the same bus already opened it
+        streams = AsyncMAC50Motor._open_streams.get(motor.serial_path)
+        if streams is None:
+            streams = _SharedStreams(motor.serial_path, motor.baud)
+            AsyncMAC50Motor._open_streams[motor.serial_path] = streams
+        streams.users += 1
+        motor._streams = streams
+        motor._bus_lock = streams.lock
+        try:
+            try:
+                # shielded so that cancelling one of the motors waiting for the port doesn't cancel it for the others
+                motor._reader, motor._writer = await asyncio.shield(streams.opened)
+            except serial.SerialException:
+                raise ValueError("Invalid serial path")
+
+            # Update the object tp match the motor
+            await motor.arefresh_config()
+            await motor.arefresh_status()
+        except Exception:
+            await motor.aclose()
+            raise
+        return motor
+
+    async def aclose(self)->None:
+        """
+        Release the serial port, which is closed once no other motor uses it. Calling it again has no effect.
+        """
+        streams, self._streams = self._streams, None
+        if streams is None:
+            return
+        self._reader = self._writer = None
+        streams.users -= 1
+        if streams.users > 0:
+            return
+
+        del AsyncMAC50Motor._open_streams[self.serial_path]
+        opened = streams.opened
+        if not opened.done():
+            opened.cancel()
+        elif not opened.cancelled() and opened.exception() is None:
+            writer = opened.result()[1]
+            writer.close()
+            await writer.wait_closed()
+
+    async def __aenter__(self)->'AsyncMAC50Motor':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback)->None:
+        await self.aclose()
+
+    def _blocking(self, *args, **kwargs):
+        """
+        Refuse the blocking and fire-and-forget methods of MAC50Motor, there is no serial thread to run them.
+        """
+        raise TypeError("AsyncMAC50Motor only talks to the motor through its coroutine methods")
+
+    read = read_async = write = write_async = write_fire_and_forget = flush = _submit = _blocking
+    read_register = read_registers = write_register = _blocking
+    get_mode = set_mode = get_position = set_target_position = refresh_config = refresh_status = _blocking
+    close = __enter__ = __exit__ = _blocking
+
+    async def aread(self, reg_num: int)->bytes:
+        """
+        Read data from the motor (low-level function), see `MAC50Motor.read`.
+
+        :param reg_num: number of the first register to be read
+        :return: data returned by the motor, little-endian (least significant byte first)
+        """
+        if reg_num < 0 or reg_num > 255:
+            raise ValueError("Invalid register number")
+
+        async with self._bus_lock:
+            return await self._aread_transaction(reg_num)
+
+    async def _aread_transaction(self, reg_num: int)->bytes:
+        """
+        Send a read request and parse the answer, with `_bus_lock` held.
+        If the answer is invalid the port is resynchronized and the request sent once more, like
+        `MAC50Motor._read_transaction`.
+
+        :param reg_num: number of the first register to be read
+        :return: data returned by the motor, see `read`
+        """
+        try:
+            return await self._aread_exchange(reg_num)
+        except ValueError:
+            # the answer may only be late: drop it, or it would be taken for the answer to the retry
+            await self._aresync()
+        try:
+            return await self._aread_exchange(reg_num)
+        except ValueError:
+            await self._aresync()
+            raise
+
+    async def _aread_exchange(self, reg_num: int)->bytes:
+        """
+        Send a read request and check the answer, with `_bus_lock` held.
+
+        :param reg_num: number of the first register to be read
+        :return: data returned by the motor, see `read`
+        """
+        message = self._read_frames[reg_num]
+        self._writer.write(message)
+        try:
+            response = await asyncio.wait_for(self._aread_response(), _answer_timeout(self.baud, len(message), _READ_RESPONSE_LENGTH, self._latency))
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            raise ValueError("Invalid frame")
+
+        return self._check_read_response(response, reg_num)
+
+    async def _aread_response(self)->bytes:
+        """
+        Receive the answer to a read request, skipping anything received before its header.
+
+        :return: the answer
+        """
+        await self._writer.drain()
+        await self._reader.readuntil(_READ_HEADER)
+        return _READ_HEADER + await self._reader.readexactly(_READ_RESPONSE_LENGTH - len(_READ_HEADER))
+
+    async def awrite(self, reg_num: int, data: bytes)->None:
+        """
+        Write data to a register on the motor (low-level function), see `MAC50Motor.write`.
+        :param reg_num: number of the register
+        :param data: data to be written, little-endian (least significant byte first)
+        """
+        message = self._write_request(reg_num, data)
+
+        async with self._bus_lock:
+            try:
+                return await self._awrite_exchange(message)
+            except ValueError:
+                # the acknowledgement may only be late: drop it, or it would be taken for the one of the retry
+                await self._aresync()
+            try:
+                return await self._awrite_exchange(message)
+            except ValueError:
+                await self._aresync()
+                raise
+
+    async def _awrite_exchange(self, message: bytes)->None:
+        """
+        Send a write request and wait for the acknowledgement, with `_bus_lock` held.
+        :param message: complete write request
+        """
+        self._writer.write(message)
+        try:
+            # skip anything received before the acknowledgement
+            await asyncio.wait_for(self._awrite_response(), _answer_timeout(self.baud, len(message), len(_WRITE_ACK), self._latency))
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            raise ValueError("Invalid response")
+
+    async def _awrite_response(self)->None:
+        """
+        Wait for the acknowledgement of a write request, skipping anything received before it.
+        """
+        await self._writer.drain()
+        await self._reader.readuntil(_WRITE_ACK)
+
+    async def _aresync(self)->None:
+        """
+        Drop everything received after an invalid answer, with `_bus_lock` held, see `MAC50Motor._resync`.
+        """
+        quiet = _answer_timeout(self.baud, 0, _READ_RESPONSE_LENGTH, self._latency)
+        loop = asyncio.get_running_loop()
+        # give up at the deadline even if the port keeps receiving, from another device or at the wrong speed
+        deadline = loop.time() + _RESYNC_TIMEOUT
+        while loop.time() < deadline:
+            try:
+                if not await asyncio.wait_for(self._reader.read(256), min(quiet, deadline - loop.time())):
+                    return
+            except asyncio.TimeoutError:
+                return
+
+    async def aread_register(self, register: Union[str, int, Register], signed=False)->int:
+        """
+        Read a register from the motor (high-level function), see `MAC50Motor.read_register`.
+        :param register: Name or number of the register
+        :return: value of the register
+        """
+        reg = self.register_from(register)
+
+        return _STRUCTS[_SIZE[reg], signed].unpack_from(await self.aread(reg.value))[0]
+
+
+    async def aread_registers(self, registers: Iterable[tuple[Union[str, int, Register], bool]])->list[int]:
+        """
+        Read several registers from the motor (high-level function), see `MAC50Motor.read_registers`.
+        :param registers: (register, signed) pairs, the register being given by name or number
+        :return: values returned by the motor, in the order the registers were given
+        """
+        regs = [(self.register_from(register), signed) for register, signed in registers]
+        plan = _plan_reads([(reg.value, _SIZE[reg], signed) for reg, signed in regs])
+
+        return await self._arun_read_plan(plan, len(regs))
+
+    async def _arun_read_plan(self, plan: list[tuple[int, str, list[int]]], count: int)->list[int]:
+        """
+        Run the reads of a plan built by `_plan_reads` in a row and decode the registers.
+
+        :param plan: read plan
+        :param count: number of registers in the plan
+        :return: value of each register, by index
+        """
+        async with self._bus_lock:
+            windows = [await self._aread_transaction(reg_num) for reg_num, _, _ in plan]
+        return _decode_reads(plan, windows, count)
+
+    async def awrite_register(self, register: Union[str, int, Register], data: bytes|int)->None:
+        """
+        Write a register to the motor (high-level function), see `MAC50Motor.write_register`.
+        :param register: Name or number of the register
+        :param data: data to be written, as int or bytes matching the size of the register
+        """
+        reg = self.register_from(register)
+
+        await self.awrite(reg.value, self._register_data(reg, data))
+
+    async def aget_mode(self)->OperatingMode:
+        """
+        Get the operating mode of the motor, see `MAC50Motor.get_mode`.
+        :return: current operating mode
+        """
+        async with self._astatus_lock:
+            mode = _operating_mode(await self.aread_register(Register.MODE_REG))
+            self._update_status({"operating mode": mode})
+        return mode
+
+    async def aset_mode(self, mode: str|bytes|int|OperatingMode)->None:
+        """
+        Set the operating mode of the motor, see `MAC50Motor.set_mode`.
+        :param mode: name, id, bytes or OperatingMode object
+        """
+        mode = _mode_from(mode)
+        config = self.config
+        min_position, max_position = config["min position"], config["max position"]
+
+        async with self._astatus_lock:
+            if mode == self.status["operating mode"]:
+                return
+
+            if mode == OperatingMode.POSITION and (min_position != 0 or max_position != 0):
+                position = await self.aread_register(Register.P_IST, signed=True)
+                if position < min_position or position > max_position:
+                    raise ValueError("Position out of bounds")
+
+            await self.awrite_register(Register.MODE_REG, mode.value)
+            self._update_status({"operating mode": mode})
+
+    async def aget_position(self)->int:
+        """
+        Get the current position of the motor, see `MAC50Motor.get_position`.
+        :return: current position
+        """
+        async with self._astatus_lock:
+            pos = await self.aread_register(Register.P_IST, signed=True)
+            self._update_status({"actual position": pos})
+        return pos
+
+    async def aset_target_position(self, position: int, ignore_mode:bool=False)->None:
+        """
+        Set the target position of the motor, see `MAC50Motor.set_target_position`.
+        :param position: target position
+        :param ignore_mode: if True, the function will not check if the motor is in position mode
+        """
+        async with self._astatus_lock:
+            if not ignore_mode and self.status["operating mode"] != OperatingMode.POSITION:
+                raise ValueError("Motor must be in position mode")
+
+            await self.awrite_register(Register.P_SOLL, position)
+            self._update_status({"target position": position})
+
+    async def arefresh_config(self)->None:
+        """
+        Refresh the configuration of the motor, see `MAC50Motor.refresh_config`.
+        """
+        self._update_config(await self._arun_read_plan(_CONFIG_READ_PLAN, len(_CONFIG_FIELDS)))
+
+    async def arefresh_status(self, fields: Iterable[str]|None=None)->None:
+        """
+        Refresh the status of the motor, see `MAC50Motor.refresh_status`.
+        :param fields: names of the entries of `self.status` to refresh, all of them if None
+        """
+        entries, plan = self._status_plan(fields)
+        async with self._astatus_lock:
+            self._update_status(self._status_values(entries, await self._arun_read_plan(plan, len(entries))), fields is None)
@@ -1,9 +1,15 @@
+from collections import deque
+from concurrent.futures import Future
 from enum import Enum
 import importlib.resources
 import json
+import queue
 import serial
-from threading import Lock
-from typing import Union
+import struct
+from threading import Lock, RLock, Thread, current_thread
+import time
+from typing import Iterable, NamedTuple, Union
+import weakref
 
 class OperatingMode(Enum):
     PASSIVE = 0
@@ -33,11 +39,304 @@ class OperatingMode(Enum):
     GEAR_FOLLOW = 24
     IHOME = 25
 
+# Operating modes indexed by value, to skip the lookup done by `OperatingMode(value)` when decoding the motor's answers
+_MODES = tuple(OperatingMode(value) for value in range(len(OperatingMode)))
+
+def _operating_mode(value: int)->OperatingMode:
+    """
+    Get the operating mode with the given value, like `OperatingMode(value)`.
+
+    :param value: value of the operating mode, as stored in the registers of the motor
+    :return: operating mode
+    """
+    if 0 <= value < len(_MODES):
+        return _MODES[value]
+    raise ValueError(f"{value} is not a valid OperatingMode")
+
+def _mode_from(mode: str|bytes|int|OperatingMode)->OperatingMode:
+    """
+    Get the operating mode given by name, id, bytes or OperatingMode object, see `MAC50Motor.set_mode`.
+
+    :param mode: name, id, bytes or OperatingMode object
+    :return: operating mode
+    """
+    if isinstance(mode, str):
+        mode = OperatingMode[mode.upper()]
+    if isinstance(mode, bytes):
+        mode = _operating_mode(int.from_bytes(mode, byteorder="little"))
+    if isinstance(mode, int):
+        mode = _operating_mode(mode)
+    if not isinstance(mode, OperatingMode):
+        raise ValueError("Invalid mode")
+    return mode
+
+# Description of the registers of the motor, loaded once and shared by all the motors
+_REGISTER_TABLE = json.loads(importlib.resources.read_text("py_mac", "registers.json"))
+
+class RegInfo(NamedTuple):
+    """
+    Properties of a register, as described in registers.json.
+    """
+    addr: int
+    name: str
+    size: int # bytes
+    mactalk: str|None # name in MacTalk
+    range: str|None
+    unit: str|None
+    description: str|None
+
+# Enum linking the register names to their addresses
+Register = Enum("Register", {name: value["nb"] for name, value in _REGISTER_TABLE.items()})
+# Dictionary linking the values of the enum to the properties of the registers sharing that address
+_REGISTERS = {}
+# and an index linking the names of the registers to their enum value, used by `MAC50Motor.register_from`
+_NAME_INDEX = {}
+for _name, _value in _REGISTER_TABLE.items():
+    _register = Register(_value["nb"])
+    _reg_info = RegInfo(_value["nb"], _name, _value["size"], _value["MacTalk"], _value["range"], _value["unit"], _value["description"])
+    # Append the properties to the dictionary entry for the register
+    _REGISTERS[_register] = _REGISTERS.get(_register, ()) + (_reg_info,)
+    _NAME_INDEX[_name] = _register
+del _name, _value, _register, _reg_info
+# Size in bytes of each register, to skip the lookups in `_REGISTERS` when reading or writing a register
+_SIZE = {register: reg_info[0].size for register, reg_info in _REGISTERS.items()}
+
+# Parts of the response to a read request (see `MAC50Motor.read`), as big-endian integers so that each part of a
+# response can be checked with a single mask and comparison
+_READ_RESPONSE_LENGTH  = 19
+_READ_HEADER           = bytes([0x52, 0x52, 0x52])
+_READ_FRAME_MASK       = int.from_bytes(bytes([0xff, 0xff, 0xff, 0x00, 0x00, 0x00, 0x00, 0xff, 0xff, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0xff, 0xff]), byteorder="big")
+_READ_FRAME_EXPECTED   = int.from_bytes(bytes([0x52, 0x52, 0x52, 0x00, 0x00, 0x00, 0x00, 0x04, 0xfb, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0xaa, 0xaa]), byteorder="big")
+_READ_ADDRESS_MASK     = int.from_bytes(bytes([0x00, 0x00, 0x00, 0xff, 0xff, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]), byteorder="big")
+_READ_ADDRESS_EXPECTED = int.from_bytes(bytes([0x00, 0x00, 0x00, 0x00, 0xff, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]), byteorder="big")
+_READ_REGISTER_MASK    = int.from_bytes(bytes([0x00, 0x00, 0x00, 0x00, 0x00, 0xff, 0xff, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]), byteorder="big")
+_READ_COMPLEMENT_MASK  = int.from_bytes(bytes([0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0xff, 0x00, 0xff, 0x00, 0xff, 0x00, 0xff, 0x00, 0x00]), byteorder="big")
+# Expected register part of the response, by register number: the register and its complement, followed by 12 bytes
+_READ_REGISTER_EXPECTED = tuple(((reg_num << 8) | (0xff ^ reg_num)) << (8 * 12) for reg_num in range(256))
+_READ_DATA_LENGTH = 4 # number of data bytes returned by a read request
+_WRITE_ACK = bytes([0x11, 0x11, 0x11])
+_END = bytes([0xaa, 0xaa]) # end of the requests and of the read responses
+
+# Time the motor takes to start answering, in seconds
+_TURNAROUND = 0.005
+# Time USB serial adapters hold received bytes back, in seconds: up to 16 ms by default (FTDI on Linux), about 1 ms in
+# low latency mode
+_USB_LATENCY = 0.016
+_LOW_USB_LATENCY = 0.001
+# Longest a single read of the serial port blocks, in seconds. The answers are waited for up to their own deadline.
+_POLL_INTERVAL = 0.005
+# Longest time spent waiting for the line to go quiet after an invalid answer, in seconds, see `MAC50Motor._resync`
+_RESYNC_TIMEOUT = 0.2
+
+def _answer_timeout(baud: int, request_length: int, answer_length: int, latency: float)->float:
+    """
+    Get how long to wait for an answer of the motor, counted from the moment the request is sent.
+
+    :param baud: Speed of the serial port, in bits per second
+    :param request_length: length of the request, in bytes
+    :param answer_length: length of the answer, in bytes
+    :param latency: time the serial adapter holds received bytes back, in seconds
+    :return: time to send the request and receive the answer (10 bits per byte), plus the turnaround of the motor and
+             the latency of the adapter, in seconds
+    """
+    return (request_length + answer_length) * 10 / baud + _TURNAROUND + latency
+
+# `struct` format characters decoding a little-endian register, by (size, signed)
+_STRUCT_CODES = {(2, False): "H", (2, True): "h", (4, False): "I", (4, True): "i"}
+# and the matching compiled structs, to decode or encode a single register
+_STRUCTS = {key: struct.Struct("<" + code) for key, code in _STRUCT_CODES.items()}
+# Translation table giving the complement (b ^ 0xff) of every byte, used to check and build the data complements
+_XOR_FF = bytes(0xff ^ b for b in range(256))
+
+def _plan_reads(registers: list[tuple[int, int, bool]])->list[tuple[int, str, list[int]]]:
+    """
+    Group registers into as few read requests as possible (see `MAC50Motor.read_registers`).
+    Each request returns the 4 bytes starting at the requested register, so the registers are sorted by number and every
+    register that fits in the window of the previous request is decoded from it instead of being read again.
+
+    :param registers: (number, size, signed) of each register
+    :return: (first register number, `struct` format decoding the window, indices of the decoded registers) of each read
+    """
+    plan = []
+    base, end = 0, 0
+    for i in sorted(range(len(registers)), key=lambda i: registers[i][0]):
+        number, size, signed = registers[i]
+        # registers are 16-bit words, so each register number is 2 bytes further in the window
+        offset = 2 * (number - base)
+        if not plan or offset < end or offset + size > _READ_DATA_LENGTH:
+            base, offset, end = number, 0, 0
+            plan.append((base, ["<"], []))
+        _, layout, indices = plan[-1]
+        layout.append("x" * (offset - end) + _STRUCT_CODES[size, signed])
+        indices.append(i)
+        end = offset + size
+
+    return [(base, "".join(layout), indices) for base, layout, indices in plan]
+
+def _decode_reads(plan: list[tuple[int, str, list[int]]], windows: list[bytes], count: int)->list[int]:
+    """
+    Decode the registers from the windows read by a plan built by `_plan_reads`.
+
+    :param plan: read plan
+    :param windows: data returned by the motor for each read of the plan
+    :param count: number of registers in the plan
+    :return: value of each register, by index
+    """
+    values = [0] * count
+    for (_, layout, indices), data in zip(plan, windows):
+        for i, value in zip(indices, struct.unpack_from(layout, data)):
+            values[i] = value
+    return values
+
+def _plan_field_reads(fields: dict[str, tuple[str, bool]])->list[tuple[int, str, list[int]]]:
+    """
+    Plan the reads refreshing entries of `MAC50Motor.config` or `MAC50Motor.status`, see `_plan_reads`.
+
+    :param fields: (register name, signed) of each entry
+    :return: read plan, indices being those of the entries in `fields`
+    """
+    return _plan_reads([(_NAME_INDEX[name].value, _SIZE[_NAME_INDEX[name]], signed) for name, signed in fields.values()])
+
+# Registers behind the entries of `MAC50Motor.config` and `MAC50Motor.status`, as (register name, signed), and the reads
+# refreshing all of them
+_CONFIG_FIELDS = {
+    "max velocity":             ("V_SOLL",       False),
+    "max acceleration":         ("A_SOLL",       False),
+    "max_torque":               ("T_SOLL",       False),
+    "gear ratio nomitor":       ("GEARF1",       False),
+    "gear ratio denominator":   ("GEARF2",       False),
+    "max winding energy":       ("I2TLIM",       False),
+    "max dumped energy":        ("UITLIM",       False),
+    "max regulation error":     ("FLWERRMAX",    False),
+    "max movement error":       ("FNCERRMAX",    False),
+    "min position":             ("MIN_P_IST",    True),
+    "max position":             ("MAX_P_IST",    True),
+    "emergency deceleration":   ("ACC_EMERG",    False),
+    "starting mode":            ("STARTMODE",    False),
+    "home position":            ("P_HOME",       True),
+    "homing velocity":          ("V_HOME",       False),
+    "homing mode":              ("HOMEMODE",     False),
+    "min supply voltage":       ("MIN_U_SUP",    False),
+    "motor type":               ("MOTORTYPE",    False),
+    "serial number":            ("SERIALNUMBER", False),
+    "address":                  ("MYADDR",       False),
+    "hardware version":         ("HWVERSION",    False),
+}
+_CONFIG_READ_PLAN = _plan_field_reads(_CONFIG_FIELDS)
+_STATUS_FIELDS = {
+    "operating mode":   ("MODE_REG",   False),
+    "target position":  ("P_SOLL",     True),
+    "actual position":  ("P_IST",      True),
+    "actual velocity":  ("V_IST",      True),
+    "load factor":      ("KVOUT",      False),
+    "winding energy":   ("I2T",        False),
+    "dumped energy":    ("UIT",        False),
+    "regulation error": ("FLWERR",     True),
+    "movement error":   ("FNCERR",     True),
+    "error":            ("ERR_STAT",   False),
+    "control":          ("CNTRL_BITS", False),
+    "supply voltage":   ("U_SUPPLY",   False),
+}
+_STATUS_READ_PLAN = _plan_field_reads(_STATUS_FIELDS)
+
+def _serial_worker(requests: queue.Queue)->None:
+    """
+    Run the wire transactions queued by a motor one after the other, until `None` is queued.
+    The thread running this function doesn't keep a reference to the motor, so that the motor can still be collected.
+
+    :param requests: queue of (function, argument, future) tuples, the result of `function(argument)` is set on the future
+    """
+    while True:
+        request = requests.get()
+        if request is None:
+            return
+        function, argument, future = request
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(function(argument))
+            except Exception as e:
+                future.set_exception(e)
+        del request, function, argument, future
+
+class _SharedPort:
+    def __init__(self, serial_path: str, baud: int):
+        """
+        Serial port shared by all the motors on the same bus, along with what has to be shared with it.
+
+        :param serial_path: Path to the serial port
+        :param baud: Speed of the serial port, in bits per second
+        """
+        self.serial = serial.Serial(serial_path, baud, timeout=_POLL_INTERVAL)
+        # Ask the driver not to hold received bytes back: USB adapters coalesce them for up to 16 ms by default (FTDI on
+        # Linux), which delays every answer. Only available on POSIX, and not supported by every driver.
+        try:
+            self.serial.set_low_latency_mode(True)
+            self.latency = _LOW_USB_LATENCY
+        except (AttributeError, NotImplementedError, OSError, ValueError):
+            self.latency = _USB_LATENCY
+        self.lock = RLock() # guards the request/response sequences on the wire, re-entrant to group several of them
+        self.users = 0
+
 class MAC50Motor:
+    # Serial ports currently opened, by path. The motors of a bus share the same port since addressing is done in the
+    # protocol, so that the port isn't opened and configured again for every motor.
+    _open_ports = {}
+    _open_ports_lock = Lock()
+    # The registers are the same for every motor
+    Register = Register
+    registers = _REGISTERS
+
     def __init__(self, serial_path: str, address: int):
         """
         Create a new MAC50Motor object.
 
+        :param serial_path: Path to the serial port
+        :param address: Address of the motor
+        """
+        self._setup(serial_path, address)
+
+        # Open the serial port, or reuse it if another motor on the same bus already opened it
+        with MAC50Motor._open_ports_lock:
+            port = MAC50Motor._open_ports.get(self.serial_path)
+            if port is None:
+                try:
+                    port = _SharedPort(self.serial_path, self.baud)
+                except serial.SerialException:
+                    raise ValueError("Invalid serial path")
+                MAC50Motor._open_ports[self.serial_path] = port
+            port.users += 1
+        self.serial = port.serial
+        # only guards the request/response sequence on the wire, shared by all the motors of the bus
+        self._bus_lock = port.lock
+        # time the serial adapter holds received bytes back, see `_answer_timeout`
+        self._latency = port.latency
+
+        # All the wire transactions are run by a dedicated thread, fed through `_tx_queue`
+        self._tx_queue = queue.Queue()
+        self._io_thread = Thread(target=_serial_worker, args=(self._tx_queue,), name=f"MAC50Motor {serial_path}:{address}", daemon=True)
+        self._io_thread.start()
+        # writes queued by `write_fire_and_forget` whose acknowledgement hasn't been checked by `flush` yet, and the first
+        # error of those already forgotten
+        self._pending_writes = deque()
+        self._write_error = None
+        # makes checking that the motor is open and queueing a request atomic with respect to `_release`, so that nothing is
+        # queued after the serial thread was told to stop
+        self._submit_lock = Lock()
+        # Release the port when the motor is closed, collected or at exit, whichever comes first
+        self._finalizer = weakref.finalize(self, MAC50Motor._release, self.serial_path, port, self._tx_queue, self._io_thread, self._submit_lock)
+
+        # Update the object tp match the motor
+        try:
+            self.refresh_config()
+            self.refresh_status()
+        except Exception:
+            self.close()
+            raise
+
+    def _setup(self, serial_path: str, address: int)->None:
+        """
+        Set up everything that doesn't involve talking to the motor: requests, registers and state.
+
         :param serial_path: Path to the serial port
         :param address: Address of the motor
         """
@@ -47,91 +346,161 @@ class MAC50Motor:
         self.serial_path = serial_path
         self.baud = 19200 # bits per second
         self.address = address # 0xff for broadcast, 0x00 for master
+        # Read requests for every register number, and start of the write requests
+        self._read_frames = tuple(bytes([0x50, 0x50, 0x50, self.address, 0xff ^ self.address, reg_num, 0xff ^ reg_num, 0xaa, 0xaa]) for reg_num in range(256))
+        self._write_prefix = bytes([0x52, 0x52, 0x52, self.address, 0xff ^ self.address])
 
-        # Load the registers from the json file in resources
-        with importlib.resources.open_text("py_mac", "registers.json") as file:
-            raw_dict = json.load(file)
-        # Generate an enum linking the register names to their addresses
-        registers = {}
-        for name, value in raw_dict.items():
-            registers[name] = value["nb"]
-        self.Register = Enum("Register", registers)
-        # Generate a dictionary linking the values of the enum to the registers properties
-        self.registers = {}
-        for name, value in raw_dict.items():
-            register = self.Register(value["nb"])
-            reg_data = {
-                "addr":        value["nb"],
-                "name":        name,
-                "size":        value["size"],
-                "MacTalk":     value["MacTalk"],
-                "range":       value["range"],
-                "unit":        value["unit"],
-                "description": value["description"]
-            }
-            # Append the data to the dictionary entry for the register
-            self.registers[register] = [*self.registers[register], reg_data] if register in self.registers else [reg_data]
-
-        # Open the serial port
-        try:
-            self.serial = serial.Serial(self.serial_path, self.baud, timeout=0.1)
-        except serial.SerialException:
-            raise ValueError("Invalid serial path")
-
-        self.config_lock = Lock()
-        self.serial_lock = Lock()
-        self.status_lock = Lock()
-
-        # Update the object tp match the motor
+        # `self.config` and `self.status` are never modified in place, they are replaced by a new dict on every update so
+        # that a reader can take a snapshot without a lock.
         self.config = {}
         self.status = {}
-        self.refresh_config()
-        self.refresh_status()
+        # Serializes the updates of `self.status` with the exchanges they come from, so that a refresh can't swap in values
+        # read before a concurrent write. Taken before `_bus_lock` (on the serial thread), never the other way around.
+        self._status_lock = RLock()
+
+    def __enter__(self)->'MAC50Motor':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback)->None:
+        self.close()
 
-    def __del__(self):
-        self.serial.close()
+    def close(self)->None:
+        """
+        Stop the serial thread once it ran what was already queued, and release the serial port, which is closed once no
+        other motor uses it. Calling it again has no effect.
+        Like `flush`, raises the error of the first write queued by `write_fire_and_forget` that failed, if any.
+        """
+        finalizer = getattr(self, "_finalizer", None)
+        if finalizer is None:
+            return
+        finalizer()
+        self.serial = None
+        # the pending writes all ran before the serial thread stopped
+        self.flush()
+
+    @staticmethod
+    def _release(serial_path: str, port: _SharedPort, tx_queue: queue.Queue, io_thread: Thread, submit_lock: Lock)->None:
+        """
+        Stop the serial thread of a motor and release its serial port, see `close`.
+        Run by `close`, or when the motor is garbage collected or at exit if it wasn't closed, so it must not refer to the
+        motor itself.
+
+        :param serial_path: Path to the serial port
+        :param port: serial port used by the motor
+        :param tx_queue: queue feeding the serial thread of the motor
+        :param io_thread: serial thread of the motor
+        :param submit_lock: lock taken by `_submit` to queue a request
+        """
+        with submit_lock:
+            tx_queue.put(None)
+        # let the serial thread finish what was queued before the port goes away, unless the motor was collected by the
+        # serial thread itself, which is then done with it
+        if io_thread is not current_thread():
+            io_thread.join()
+            # nothing can be queued after the sentinel, but a request left behind would never be answered
+            while not tx_queue.empty():
+                request = tx_queue.get_nowait()
+                if request is not None and request[2].set_running_or_notify_cancel():
+                    request[2].set_exception(ValueError("Motor is closed"))
+        with MAC50Motor._open_ports_lock:
+            port.users -= 1
+            if port.users == 0:
+                del MAC50Motor._open_ports[serial_path]
+                port.serial.close()
 
     def read(self, reg_num: int)->bytes:
         """
         Read data from the motor (low-level function).
 
         :param reg_num: number of the first register to be read
-        :return: data returned by the motor, little-endian (least significant byte first), typically 8 bytes
+        :return: data returned by the motor, little-endian (least significant byte first), always 4 bytes
+        """
+        return self.read_async(reg_num).result()
+
+    def read_async(self, reg_num: int)->Future:
+        """
+        Queue a read of data from the motor, without waiting for the answer (low-level function).
+
+        :param reg_num: number of the first register to be read
+        :return: future resolving to the data returned by the motor, see `read`
         """
         if reg_num < 0 or reg_num > 255:
             raise ValueError("Invalid register number")
-        
-        message = [0x50, 0x50, 0x50, self.address, 0xff ^ self.address, reg_num, 0xff ^ reg_num, 0xaa, 0xaa]
 
-        with self.serial_lock:
-            self.serial.reset_input_buffer()
-            self.serial.reset_output_buffer()
-            self.serial.write(bytes(message))
-            response = self.serial.read(19)
+        return self._submit(self._read_transaction, reg_num)
+
+    def _submit(self, function, argument)->Future:
+        """
+        Queue a call to `function(argument)` on the serial thread.
+
+        :param function: function talking to the motor
+        :param argument: argument given to the function
+        :return: future resolving to the result of the function
+        """
+        future = Future()
+        with self._submit_lock:
+            if not self._finalizer.alive:
+                raise ValueError("Motor is closed")
+            self._tx_queue.put((function, argument, future))
+        return future
+
+    def _read_transaction(self, reg_num: int)->bytes:
+        """
+        Send a read request and parse the answer, on the serial thread.
+        If the answer is invalid the port is resynchronized and the request sent once more.
+
+        :param reg_num: number of the first register to be read
+        :return: data returned by the motor, see `read`
+        """
+        message = self._read_frames[reg_num]
+
+        with self._bus_lock:
+            try:
+                return self._read_exchange(message, reg_num)
+            except ValueError:
+                # the answer may only be late: drop it, or it would be taken for the answer to the retry
+                self._resync()
+            try:
+                return self._read_exchange(message, reg_num)
+            except ValueError:
+                self._resync()
+                raise
+
+    def _read_exchange(self, message: bytes, reg_num: int)->bytes:
+        """
+        Send a read request and check the answer, with `_bus_lock` held.
 
-        expected      = [0x52, 0x52, 0x52, 0x00, 0xff, reg_num, 0xff ^ reg_num, 0x04, 0xfb,  0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0xaa, 0xaa]
-        frame_mask    = [0xff, 0xff, 0xff, 0x00, 0x00, 0x00, 0x00, 0xff, 0xff, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0xff, 0xff]
-        address_mask  = [0x00, 0x00, 0x00, 0xff, 0xff, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]
-        register_mask = [0x00, 0x00, 0x00, 0x00, 0x00, 0xff, 0xff, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]
+        :param message: complete read request
+        :param reg_num: number of the first register to be read
+        :return: data returned by the motor, see `read`
+        """
+        self._drop_received()
+        deadline = time.monotonic() + _answer_timeout(self.baud, len(message), _READ_RESPONSE_LENGTH, self._latency)
+        self.serial.write(message)
+        return self._check_read_response(self._receive(_READ_HEADER, _READ_RESPONSE_LENGTH, deadline), reg_num)
+
+    def _check_read_response(self, response: bytes, reg_num: int)->bytes:
+        """
+        Check the answer to a read request and extract its data.
 
-        if not all([(r & fm) == (e & fm) for r, fm, e in zip(response, frame_mask, expected)]):
+        :param response: answer of the motor
+        :param reg_num: number of the first register read
+        :return: data returned by the motor, see `read`
+        """
+        response_int = int.from_bytes(response, byteorder="big")
+        if len(response) != _READ_RESPONSE_LENGTH or response_int & _READ_FRAME_MASK != _READ_FRAME_EXPECTED:
             raise ValueError("Invalid frame")
-        if not all([(r & am) == (e & am) for r, am, e in zip(response, address_mask, expected)]):
-            # TODO: if invalid address, try to read again
+        if response_int & _READ_ADDRESS_MASK != _READ_ADDRESS_EXPECTED:
             raise ValueError("Invalid address")
-        if not all([(r & rm) == (e & rm) for r, rm, e in zip(response, register_mask, expected)]):
+        if response_int & _READ_REGISTER_MASK != _READ_REGISTER_EXPECTED[reg_num]:
             raise ValueError("Invalid register")
 
-        # split the response between the data and the complement
-        data_full = response[9:17]
-        data = data_full[0::2]
-        complement = data_full[1::2]
-        complement_computed = bytes([0xff ^b for b in data])
-        if complement != complement_computed:
-            # TODO: if invalid complement, try to read again
+        # each data byte is followed by its complement, so shifting the response by one byte and XORing it with itself
+        # must give 0xff at the place of every complement
+        if ((response_int >> 8) ^ response_int) & _READ_COMPLEMENT_MASK != _READ_COMPLEMENT_MASK:
             raise ValueError("Invalid complement")
 
-        return data
+        return response[9:17:2]
 
     def write(self, reg_num: int, data: bytes)->None:
         """
@@ -139,6 +508,52 @@ class MAC50Motor:
         :param reg_num: number of the register
         :param data: data to be written, little-endian (least significant byte first)
         """
+        self.write_async(reg_num, data).result()
+
+    def write_async(self, reg_num: int, data: bytes)->Future:
+        """
+        Queue a write of data to a register on the motor, without waiting for the acknowledgement (low-level function).
+        :param reg_num: number of the register
+        :param data: data to be written, little-endian (least significant byte first)
+        :return: future resolving to None once the motor acknowledged the write
+        """
+        return self._submit(self._write_transaction, self._write_request(reg_num, data))
+
+    def write_fire_and_forget(self, reg_num: int, data: bytes)->None:
+        """
+        Queue a write of data to a register on the motor and return at once (low-level function), for streams of writes
+        like successive target positions. The acknowledgements are only checked by `flush`.
+        :param reg_num: number of the register
+        :param data: data to be written, little-endian (least significant byte first)
+        """
+        pending = self._pending_writes
+        # forget the writes already done, so that the queue doesn't grow between two flushes, keeping the first error
+        while pending and pending[0].done():
+            exception = pending.popleft().exception()
+            if self._write_error is None:
+                self._write_error = exception
+        pending.append(self.write_async(reg_num, data))
+
+    def flush(self)->None:
+        """
+        Wait until the writes queued by `write_fire_and_forget` are acknowledged.
+        If some of them failed, the error of the first one is raised once they are all done.
+        """
+        error, self._write_error = self._write_error, None
+        while self._pending_writes:
+            exception = self._pending_writes.popleft().exception()
+            if error is None:
+                error = exception
+        if error is not None:
+            raise error
+
+    def _write_request(self, reg_num: int, data: bytes)->bytes:
+        """
+        Build a write request.
+        :param reg_num: number of the register
+        :param data: data to be written, little-endian (least significant byte first)
+        :return: complete write request
+        """
         if reg_num < 0 or reg_num > 255:
             raise ValueError("Invalid register number")
         if len(data) % 2 != 0:
@@ -146,18 +561,91 @@ class MAC50Motor:
         if len(data) > 255:
             raise ValueError("Number of bytes must be less than 256")
 
-        complement = [0xff ^ b for b in data]
-        data_with_complement = [b for pair in zip(data, complement) for b in pair]
-        message = [0x52, 0x52, 0x52, self.address, 0xff ^ self.address, reg_num, 0xff ^ reg_num, len(data), 0xff ^ len(data)] + data_with_complement + [0xaa, 0xaa]
+        data_with_complement = bytearray(2 * len(data))
+        data_with_complement[0::2] = data
+        data_with_complement[1::2] = data.translate(_XOR_FF)
+        return self._write_prefix + bytes([reg_num, 0xff ^ reg_num, len(data), 0xff ^ len(data)]) + data_with_complement + _END
 
-        with self.serial_lock:
-            self.serial.write(bytes(message))
-            response = self.serial.read(3)
+    def _write_transaction(self, message: bytes)->None:
+        """
+        Send a write request and check the acknowledgement, on the serial thread.
+        If the acknowledgement is invalid the port is resynchronized and the request sent once more.
+        :param message: complete write request
+        """
+        with self._bus_lock:
+            try:
+                return self._write_exchange(message)
+            except ValueError:
+                # the answer may only be late: drop it, or it would be taken for the answer to the retry
+                self._resync()
+            try:
+                return self._write_exchange(message)
+            except ValueError:
+                self._resync()
+                raise
+
+    def _write_exchange(self, message: bytes)->None:
+        """
+        Send a write request and check the acknowledgement, with `_bus_lock` held.
+        :param message: complete write request
+        """
+        self._drop_received()
+        deadline = time.monotonic() + _answer_timeout(self.baud, len(message), len(_WRITE_ACK), self._latency)
+        self.serial.write(message)
+        response = self._receive(_WRITE_ACK, len(_WRITE_ACK), deadline)
 
-        expected = bytes([0x11, 0x11, 0x11])
-        if response != expected:
+        if response != _WRITE_ACK:
             raise ValueError("Invalid response")
 
+    def _drop_received(self)->None:
+        """
+        Drop what was received since the last exchange before sending a request, with `_bus_lock` held, so that nothing
+        is taken for the answer but what the motor sends after the request. Healthy exchanges leave nothing behind, so
+        the port is only flushed when there is something to drop.
+        """
+        if self.serial.in_waiting:
+            self.serial.reset_input_buffer()
+
+    def _resync(self)->None:
+        """
+        Drop everything pending on the serial port after an invalid answer, with `_bus_lock` held.
+        The rest of an answer still on its way is dropped too, by waiting for the line to stay quiet as long as an answer
+        takes, so that it isn't taken for the answer to the next request. Only done on errors, so that a healthy exchange
+        doesn't pay for it.
+        """
+        self.serial.reset_output_buffer()
+        self.serial.reset_input_buffer()
+
+        quiet = _answer_timeout(self.baud, 0, _READ_RESPONSE_LENGTH, self._latency)
+        now = time.monotonic()
+        # give up at the deadline even if the port keeps receiving, from another device or at the wrong speed
+        deadline, quiet_until = now + _RESYNC_TIMEOUT, now + quiet
+        while now < quiet_until and now < deadline:
+            if self.serial.read(max(self.serial.in_waiting, 1)):
+                quiet_until = time.monotonic() + quiet
+            now = time.monotonic()
+
+    def _receive(self, header: bytes, size: int, deadline: float)->bytes:
+        """
+        Receive an answer from the motor, on the serial thread.
+        Anything received before `header` is discarded, and so is anything received after the answer.
+        :param header: first bytes of the expected answer
+        :param size: length of the expected answer, header included
+        :param deadline: `time.monotonic()` after which we stop waiting, even if the port keeps receiving something else
+        :return: the answer, shorter than `size` if the motor did not send all of it before the deadline
+        """
+        received = bytearray()
+        while True:
+            start = received.find(header)
+            # drop the garbage before the header, keeping what could be the beginning of a header cut in half
+            del received[:start if start >= 0 else max(0, len(received) - len(header) + 1)]
+            if start >= 0 and len(received) >= size or time.monotonic() >= deadline:
+                break
+            # wait for the missing bytes only, and take whatever else already arrived along the way
+            received += self.serial.read(max(self.serial.in_waiting, size - len(received)))
+
+        return bytes(received[:size])
+
     def read_register(self, register: Union[str, int, 'Register'], signed=False)->int:
         """
         Read a register from the motor (high-level function).
@@ -166,7 +654,40 @@ class MAC50Motor:
         """
         reg = self.register_from(register)
 
-        return int.from_bytes(self.read(reg.value)[0:self.registers[reg][0]["size"]], byteorder="little", signed=signed)
+        return _STRUCTS[_SIZE[reg], signed].unpack_from(self.read(reg.value))[0]
+
+    def read_registers(self, registers: Iterable[tuple[Union[str, int, 'Register'], bool]])->list[int]:
+        """
+        Read several registers from the motor, sharing wire transactions between neighbouring registers (high-level function).
+        Each `read` returns the 4 bytes starting at the requested register, so the registers are sorted by number and every
+        register that fits in the window of the previous `read` is sliced out of it instead of being read again.
+        :param registers: (register, signed) pairs, the register being given by name or number
+        :return: values returned by the motor, in the order the registers were given
+        """
+        regs = [(self.register_from(register), signed) for register, signed in registers]
+        plan = _plan_reads([(reg.value, _SIZE[reg], signed) for reg, signed in regs])
+
+        return self._run_read_plan(plan, len(regs))
+
+    def _run_read_plan(self, plan: list[tuple[int, str, list[int]]], count: int)->list[int]:
+        """
+        Run the reads of a plan built by `_plan_reads` and decode the registers.
+
+        :param plan: read plan
+        :param count: number of registers in the plan
+        :return: value of each register, by index
+        """
+        return _decode_reads(plan, self._submit(self._read_windows, [base for base, _, _ in plan]).result(), count)
+
+    def _read_windows(self, reg_nums: list[int])->list[bytes]:
+        """
+        Read several windows in a row, on the serial thread, without letting the other motors of the bus in between.
+
+        :param reg_nums: number of the first register of each window
+        :return: data returned by the motor for each window, see `read`
+        """
+        with self._bus_lock:
+            return [self._read_transaction(reg_num) for reg_num in reg_nums]
 
     def write_register(self, register: Union[str, int, 'Register'], data: bytes|int)->None:
         """
@@ -176,23 +697,38 @@ class MAC50Motor:
         """
         reg = self.register_from(register)
 
+        self.write(reg.value, self._register_data(reg, data))
+
+    @staticmethod
+    def _register_data(reg: 'Register', data: bytes|int)->bytes:
+        """
+        Get the data to write to a register, see `write_register`.
+        :param reg: the register
+        :param data: data to be written, as int or bytes
+        :return: data to be written, as bytes matching the size of the register
+        """
+        size = _SIZE[reg]
+
         if isinstance(data, int):
-            data = data.to_bytes(self.registers[reg][0]["size"], byteorder="little")
-        elif len(data) != self.registers[reg][0]["size"]:
+            # negative values are written in two's complement
+            try:
+                return _STRUCTS[size, data < 0].pack(data)
+            except struct.error:
+                raise ValueError("Invalid data")
+        if len(data) != size:
             raise ValueError("Invalid data size")
-
-        self.write(register, data)
+        return data
 
     def get_mode(self)->OperatingMode:
         """
         Get the operating mode of the motor.
         :return: current operating mode
         """
-        with self.status_lock:
-            mode = OperatingMode(self.read_register(self.Register.MODE_REG))
+        with self._status_lock:
+            mode = _operating_mode(self.read_register(self.Register.MODE_REG))
 
             # update the object to match the motor
-            self.status["operating mode"] = mode
+            self._update_status({"operating mode": mode})
 
         return mode
 
@@ -201,36 +737,31 @@ class MAC50Motor:
         Set the operating mode of the motor.
         :param mode: name, id, bytes or OperatingMode object
         """
-        if isinstance(mode, str):
-            mode = OperatingMode[mode.upper()]
-        if isinstance(mode, bytes):
-            mode = OperatingMode(int.from_bytes(mode, byteorder="little"))
-        if isinstance(mode, int):
-            mode = OperatingMode(mode)
-        if not isinstance(mode, OperatingMode):
-            raise ValueError("Invalid mode")
+        mode = _mode_from(mode)
+        config = self.config
+        min_position, max_position = config["min position"], config["max position"]
 
-        with self.status_lock:
+        with self._status_lock:
             if mode == self.status["operating mode"]:
                 return
 
-            with self.config_lock:
-                if mode == OperatingMode.POSITION and (self.config["min position"] != 0 or self.config["max position"] != 0):
-                    position = self.get_position()
-                    if position < self.config["min position"] or position > self.config["max position"]:
-                        raise ValueError("Position out of bounds")
+            if mode == OperatingMode.POSITION and (min_position != 0 or max_position != 0):
+                # only needed for the bounds check, `self.status` is left as is
+                position = self.read_register(self.Register.P_IST, signed=True)
+                if position < min_position or position > max_position:
+                    raise ValueError("Position out of bounds")
 
-                self.write_register(self.Register.MODE_REG, mode.value)
-                self.status["operating mode"] = mode
+            self.write_register(self.Register.MODE_REG, mode.value)
+            self._update_status({"operating mode": mode})
 
     def get_position(self)->int:
         """
         Get the current position of the motor.
         :return: current position
         """
-        with self.status_lock:
+        with self._status_lock:
             pos = self.read_register(self.Register.P_IST, signed=True)
-            self.status["actual position"] = pos
+            self._update_status({"actual position": pos})
         return pos
 
     def set_target_position(self, position: int, ignore_mode:bool=False)->None:
@@ -239,68 +770,79 @@ class MAC50Motor:
         :param position: target position
         :param ignore_mode: if True, the function will not check if the motor is in position mode
         """
-        with self.config_lock:
+        with self._status_lock:
             # check that the motor is in position mode
             if not ignore_mode and self.status["operating mode"] != OperatingMode.POSITION:
                 raise ValueError("Motor must be in position mode")
 
-            with self.status_lock:
-                self.write_register(self.Register.P_SOLL, position)
-                self.status["target position"] = position
+            self.write_register(self.Register.P_SOLL, position)
+            self._update_status({"target position": position})
 
     def refresh_config(self)->None:
         """"
         Refresh the status of the motor.
         """
-        with self.config_lock:
-            self.config = {
-                "max velocity":                self.read_register(self.Register.V_SOLL),
-                "max acceleration":            self.read_register(self.Register.A_SOLL),
-                "max_torque":                  self.read_register(self.Register.T_SOLL),
-                "gear ratio nomitor":          self.read_register(self.Register.GEARF1),
-                "gear ratio denominator":      self.read_register(self.Register.GEARF2),
-                "max winding energy":          self.read_register(self.Register.I2TLIM),
-                "max dumped energy":           self.read_register(self.Register.UITLIM),
-                "max regulation error":        self.read_register(self.Register.FLWERRMAX),
-                "max movement error":          self.read_register(self.Register.FNCERRMAX),
-                "min position":                self.read_register(self.Register.MIN_P_IST, signed=True),
-                "max position":                self.read_register(self.Register.MAX_P_IST, signed=True),
-                "emergency deceleration":      self.read_register(self.Register.ACC_EMERG),
-                "starting mode": OperatingMode(self.read_register(self.Register.STARTMODE)),
-                "home position":               self.read_register(self.Register.P_HOME, signed=True),
-                "homing velocity":             self.read_register(self.Register.V_HOME),
-                "homing mode":                 self.read_register(self.Register.HOMEMODE),
-                "min supply voltage":          self.read_register(self.Register.MIN_U_SUP),
-                "motor type":                  self.read_register(self.Register.MOTORTYPE),
-                "serial number":               self.read_register(self.Register.SERIALNUMBER),
-                "address":                     self.read_register(self.Register.MYADDR),
-                "hardware version":            self.read_register(self.Register.HWVERSION),
-            }
-
-    def refresh_status(self)->None:
-        """"
+        self._update_config(self._run_read_plan(_CONFIG_READ_PLAN, len(_CONFIG_FIELDS)))
+
+    def _update_config(self, values: list[int])->None:
+        """
+        Replace `self.config` with the values read from the motor.
+        :param values: value of the register behind each entry of `_CONFIG_FIELDS`
+        """
+        config = dict(zip(_CONFIG_FIELDS, values))
+        config["starting mode"] = _operating_mode(config["starting mode"])
+        self.config = config
+
+    def refresh_status(self, fields: Iterable[str]|None=None)->None:
+        """
         Refresh the status of the motor.
+        :param fields: names of the entries of `self.status` to refresh, all of them if None. Only the registers of these
+                       entries are read from the motor, the other entries are left untouched.
+        """
+        entries, plan = self._status_plan(fields)
+        with self._status_lock:
+            self._update_status(self._status_values(entries, self._run_read_plan(plan, len(entries))), fields is None)
+
+    def _status_plan(self, fields: Iterable[str]|None)->tuple[dict[str, tuple[str, bool]], list[tuple[int, str, list[int]]]]:
+        """
+        Get the entries of `self.status` to refresh and the reads refreshing them.
+        :param fields: names of the entries of `self.status` to refresh, all of them if None
+        :return: (register name, signed) of each entry to refresh, and the read plan
+        """
+        if fields is None:
+            return _STATUS_FIELDS, _STATUS_READ_PLAN
+        try:
+            entries = {field: _STATUS_FIELDS[field] for field in fields}
+        except KeyError:
+            raise ValueError("Invalid field")
+        return entries, _plan_field_reads(entries)
+
+    @staticmethod
+    def _status_values(entries: dict[str, tuple[str, bool]], values: list[int])->dict:
+        """
+        Build the entries of `self.status` from the values read from the motor.
+        :param entries: entries of `self.status` that were read, see `_status_plan`
+        :param values: value of the register behind each entry
+        :return: new value of each entry
         """
-        with self.status_lock:
-            self.status = {
-                "operating mode": OperatingMode(self.read_register(self.Register.MODE_REG)),
-                "target position":  self.read_register(self.Register.P_SOLL, signed=True),
-                "actual position":  self.read_register(self.Register.P_IST, signed=True),
-                "actual velocity":  self.read_register(self.Register.V_IST, signed=True),
-                "load factor":      self.read_register(self.Register.KVOUT),
-                "winding energy":   self.read_register(self.Register.I2T),
-                "dumped energy":    self.read_register(self.Register.UIT),
-                "regulation error": self.read_register(self.Register.FLWERR, signed=True),
-                "movement error":   self.read_register(self.Register.FNCERR, signed=True),
-                "error":            self.read_register(self.Register.ERR_STAT),
-                "control":          self.read_register(self.Register.CNTRL_BITS),
-                "supply voltage":   self.read_register(self.Register.U_SUPPLY),
-            }
+        status = dict(zip(entries, values))
+        if "operating mode" in status:
+            status["operating mode"] = _operating_mode(status["operating mode"])
+        return status
+
+    def _update_status(self, status: dict, replace: bool=False)->None:
+        """
+        Swap in a new `self.status`, the current one is never modified in place.
+        :param status: new value of the entries to update
+        :param replace: if True, `self.status` is replaced instead of updated
+        """
+        with self._status_lock:
+            self.status = status if replace else {**self.status, **status}
 
     def register_from(self, register: Union[str, int, 'Register'])->'Register':
         """
         Get the Register object corresponding to the given register.
-        :param register: Name or number of the register
+        :param register: Name (case-insensitive) or number of the register
         :return: Register object
         """
         if isinstance(register, self.Register):
@@ -308,10 +850,8 @@ class MAC50Motor:
         if isinstance(register, int):
             return self.Register(register)
         if isinstance(register, str):
-            # search `self.registers` for the register with the given name
-            for k, v in self.registers.items():
-                for reg_data in v:
-                    if reg_data["name"] == register:
-                        return k
-            raise ValueError("Invalid register")
+            try:
+                return _NAME_INDEX[register.upper()]
+            except KeyError:
+                raise ValueError("Invalid register")
         raise ValueError("Invalid register")
\ No newline at end of file
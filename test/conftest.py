@@ -0,0 +1,180 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import serial
+
+from py_mac import AsyncMAC50Motor as async_mac
+from py_mac.MAC50Motor import MAC50Motor, OperatingMode
+
+
+class FakeBus:
+    """
+    Motor at the far end of a fake serial port, answering in order and in real time like a motor at 19200 baud would.
+    """
+    def __init__(self):
+        # 16-bit registers of each motor by address, each read returns 4 bytes starting at the requested one
+        self.memories = {}
+        self.turnaround = 0.0005  # seconds before the motor starts answering
+        self.delays = []  # extra delay of the next answers, in seconds
+        self.garbage = b""  # sent before the next answer
+        self.usb_latency = 0.0  # added to every byte when the low latency mode is not set
+        self.low_latency_supported = True
+        self.ports = []
+
+    def memory(self, address: int)->bytearray:
+        if address not in self.memories:
+            self.memories[address] = bytearray(2 * 260)
+            self.set(2, 2, OperatingMode.POSITION.value, address)  # MODE_REG
+            self.set(10, 4, -5, address)                           # P_IST
+        return self.memories[address]
+
+    def set(self, reg_num: int, size: int, value: int, address: int=1)->None:
+        self.memory(address)[2 * reg_num:2 * reg_num + size] = value.to_bytes(size, "little", signed=value < 0)
+
+    def get(self, reg_num: int, size: int, signed: bool=False, address: int=1)->int:
+        return int.from_bytes(self.memory(address)[2 * reg_num:2 * reg_num + size], "little", signed=signed)
+
+    def answer(self, frame: bytes)->bytes:
+        # the answers carry the address of the master, not the one of the motor
+        memory = self.memory(frame[3])
+        reg_num = frame[5]
+        if frame[:3] == b"\x50\x50\x50":
+            data = memory[2 * reg_num:2 * reg_num + 4]
+            return (bytes([0x52, 0x52, 0x52, 0x00, 0xff, reg_num, 0xff ^ reg_num, 0x04, 0xfb])
+                    + bytes(b for d in data for b in (d, 0xff ^ d)) + b"\xaa\xaa")
+        length = frame[7]
+        memory[2 * reg_num:2 * reg_num + length] = frame[9:9 + 2 * length:2]
+        return b"\x11\x11\x11"
+
+
+class FakeSerial:
+    bus = None
+
+    def __init__(self, path: str, baud: int, timeout: float=None):
+        self.baud = baud
+        self.timeout = timeout
+        self.latency = self.bus.usb_latency
+        self.received = []  # (time at which it can be read, byte)
+        self.line_free = 0.0
+        self.frames = []
+        self.is_open = True
+        self.lock = threading.Lock()
+        self.bus.ports.append(self)
+
+    def set_low_latency_mode(self, enable: bool)->None:
+        if not self.bus.low_latency_supported:
+            raise NotImplementedError
+        self.latency = 0.0
+
+    def close(self)->None:
+        self.is_open = False
+
+    def _check_open(self)->None:
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+
+    def reset_output_buffer(self)->None:
+        self._check_open()
+
+    def reset_input_buffer(self)->None:
+        self._check_open()
+        now = time.monotonic()
+        with self.lock:
+            self.received = [item for item in self.received if item[0] > now]
+
+    @property
+    def in_waiting(self)->int:
+        self._check_open()
+        now = time.monotonic()
+        with self.lock:
+            return sum(1 for ready, _ in self.received if ready <= now)
+
+    def write(self, frame: bytes)->int:
+        self._check_open()
+        bus = self.bus
+        frame = bytes(frame)
+        self.frames.append(frame)
+        byte_time = 10 / self.baud
+        now = time.monotonic()
+        extra = bus.delays.pop(0) if bus.delays else 0.0
+        start = max(now + len(frame) * byte_time + bus.turnaround + extra, self.line_free)
+        answer = bus.garbage + bus.answer(frame)
+        bus.garbage = b""
+        with self.lock:
+            for i, byte in enumerate(answer):
+                self.received.append((start + (i + 1) * byte_time + self.latency, byte))
+            self.line_free = start + len(answer) * byte_time
+        return len(frame)
+
+    def read(self, size: int=1)->bytes:
+        self._check_open()
+        deadline = time.monotonic() + (self.timeout or 0)
+        while True:
+            now = time.monotonic()
+            with self.lock:
+                ready = [item for item in self.received if item[0] <= now]
+                if len(ready) >= size or now >= deadline:
+                    ready = ready[:size]
+                    del self.received[:len(ready)]
+                    return bytes(byte for _, byte in ready)
+            time.sleep(0.0002)
+
+
+class FakeStreamWriter:
+    """
+    Writing end of the asyncio streams of a fake serial port, the answers of the motor are fed to `reader`.
+    """
+    def __init__(self, bus: FakeBus, baud: int):
+        self.bus = bus
+        self.baud = baud
+        self.reader = asyncio.StreamReader()
+        self.line_free = 0.0
+        self.closed = False
+
+    def write(self, frame: bytes)->None:
+        loop = asyncio.get_running_loop()
+        bus = self.bus
+        byte_time = 10 / self.baud
+        extra = bus.delays.pop(0) if bus.delays else 0.0
+        start = max(loop.time() + len(frame) * byte_time + bus.turnaround + extra, self.line_free)
+        answer = bus.garbage + bus.answer(bytes(frame))
+        bus.garbage = b""
+        self.line_free = start + len(answer) * byte_time
+        loop.call_at(self.line_free, self.reader.feed_data, answer)
+
+    async def drain(self)->None:
+        pass
+
+    def close(self)->None:
+        self.closed = True
+
+    async def wait_closed(self)->None:
+        pass
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    bus = FakeBus()
+    monkeypatch.setattr(FakeSerial, "bus", bus)
+    monkeypatch.setattr(serial, "Serial", FakeSerial)
+    return bus
+
+
+@pytest.fixture
+def motor(bus):
+    with MAC50Motor("/dev/fake", 1) as motor:
+        yield motor
+
+
+@pytest.fixture
+def open_async(bus, monkeypatch):
+    writers = []
+
+    async def open_serial_connection(url: str, baudrate: int):
+        writers.append(FakeStreamWriter(bus, baudrate))
+        return writers[-1].reader, writers[-1]
+
+    monkeypatch.setattr(async_mac, "open_serial_connection", open_serial_connection)
+    return writers
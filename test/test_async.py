@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+import serial
+
+from py_mac import AsyncMAC50Motor as async_mac
+from py_mac.AsyncMAC50Motor import AsyncMAC50Motor
+from py_mac.MAC50Motor import OperatingMode
+
+
+def test_async_happy_path(bus, open_async):
+    async def run():
+        motor = await AsyncMAC50Motor.open("/dev/fake", 1)
+        assert motor.status["actual position"] == -5
+
+        bus.set(10, 4, 1234)
+        assert await motor.aget_position() == 1234
+        await motor.aset_target_position(-300)
+        assert bus.get(3, 4, signed=True) == -300
+        await motor.aset_mode("velocity")
+        assert await motor.aget_mode() == OperatingMode.VELOCITY
+        assert await motor.aread_register("MODE_REG") == OperatingMode.VELOCITY.value
+        bus.set(10, 4, 55)
+        await motor.arefresh_status()
+        assert motor.status["actual position"] == 55
+
+        await motor.aclose()
+        assert open_async[0].closed
+
+    asyncio.run(run())
+
+
+def test_async_late_answer_is_not_taken_for_the_next_one(bus, open_async):
+    async def run():
+        motor = await AsyncMAC50Motor.open("/dev/fake", 1)
+        bus.delays = [0.03]
+        for position in (111, 222, 333):
+            bus.set(10, 4, position)
+            assert await motor.aget_position() == position
+        await motor.aclose()
+
+    asyncio.run(run())
+
+
+def test_async_blocking_methods_are_refused(bus, open_async):
+    async def run():
+        async with await AsyncMAC50Motor.open("/dev/fake", 1) as motor:
+            blocking = [
+                (motor.read, 10), (motor.read_async, 10), (motor.write, 3, bytes(4)), (motor.write_async, 3, bytes(4)),
+                (motor.write_fire_and_forget, 3, bytes(4)), (motor.flush,), (motor.read_register, "P_IST"),
+                (motor.read_registers, [("P_IST", True)]), (motor.write_register, "P_SOLL", 0), (motor.get_mode,),
+                (motor.set_mode, OperatingMode.POSITION), (motor.get_position,), (motor.set_target_position, 0),
+                (motor.refresh_config,), (motor.refresh_status,), (motor.close,),
+            ]
+            for function, *arguments in blocking:
+                with pytest.raises(TypeError):
+                    function(*arguments)
+            with pytest.raises(TypeError):
+                with motor:
+                    pass
+            assert not open_async[0].closed
+        assert open_async[0].closed
+
+    asyncio.run(run())
+
+
+def test_async_motors_share_the_port(bus, open_async):
+    async def run():
+        motor, other = await asyncio.gather(AsyncMAC50Motor.open("/dev/fake", 1), AsyncMAC50Motor.open("/dev/fake", 2))
+        assert len(open_async) == 1
+        assert motor._bus_lock is other._bus_lock
+
+        bus.set(10, 4, 111, address=1)
+        bus.set(10, 4, 222, address=2)
+        # the requests of both motors are sent one after the other, so that each gets its own answer
+        assert await asyncio.gather(motor.aget_position(), other.aget_position()) == [111, 222]
+        # the answer to the retry is late too
+        bus.delays = [0.03, 0.03]
+        with pytest.raises(ValueError):
+            await motor.aget_position()
+        assert await other.aget_position() == 222
+        assert await motor.aget_position() == 111
+
+        await motor.aclose()
+        assert not open_async[0].closed
+        await other.aclose()
+        assert open_async[0].closed
+        assert not AsyncMAC50Motor._open_streams
+
+    asyncio.run(run())
+
+
+def test_async_invalid_serial_path(bus, monkeypatch):
+    async def open_serial_connection(url: str, baudrate: int):
+        raise serial.SerialException()
+
+    monkeypatch.setattr(async_mac, "open_serial_connection", open_serial_connection)
+
+    async def run():
+        with pytest.raises(ValueError, match="Invalid serial path"):
+            await AsyncMAC50Motor.open("/dev/fake", 1)
+        assert not AsyncMAC50Motor._open_streams
+
+    asyncio.run(run())
@@ -0,0 +1,35 @@
+import pytest
+
+from py_mac.MAC50Motor import MAC50Motor
+
+
+def test_write_fire_and_forget(bus, motor):
+    for position in range(5):
+        motor.write_fire_and_forget(3, position.to_bytes(4, "little"))
+    motor.flush()
+    assert bus.get(3, 4) == 4
+
+
+def test_flush_raises_the_first_error(bus, motor):
+    # the motor doesn't acknowledge anything anymore
+    answer = bus.answer
+    bus.answer = lambda frame: b"" if frame[:3] == b"\x52\x52\x52" else answer(frame)
+    motor.write_fire_and_forget(3, bytes(4))
+    motor.write_async(3, bytes(4)).exception()
+    bus.answer = answer
+    # the failed write is already done, it is forgotten but its error is kept
+    motor.write_fire_and_forget(3, bytes(4))
+    assert len(motor._pending_writes) == 1
+    with pytest.raises(ValueError, match="Invalid response"):
+        motor.flush()
+    motor.flush()
+
+
+def test_close_raises_the_error_of_pending_writes(bus):
+    motor = MAC50Motor("/dev/fake", 1)
+    bus.answer = lambda frame: b""
+    motor.write_fire_and_forget(3, bytes(4))
+    with pytest.raises(ValueError, match="Invalid response"):
+        motor.close()
+    assert not bus.ports[0].is_open
+    motor.close()
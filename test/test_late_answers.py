@@ -0,0 +1,22 @@
+import pytest
+
+from py_mac.MAC50Motor import MAC50Motor
+
+
+def test_late_answer_is_not_taken_for_the_next_one(bus, motor):
+    bus.delays = [0.02]
+    for position in (111, 222, 333):
+        bus.set(10, 4, position)
+        assert motor.get_position() == position
+
+
+def test_late_answer_is_not_taken_by_another_motor(bus, motor):
+    with MAC50Motor("/dev/fake", 2) as other:
+        bus.set(10, 4, 111, address=1)
+        bus.set(10, 4, 222, address=2)
+        # the answer to the retry is late too
+        bus.delays = [0.02, 0.02]
+        with pytest.raises(ValueError):
+            motor.get_position()
+        assert other.get_position() == 222
+        assert motor.get_position() == 111
@@ -0,0 +1,40 @@
+import struct
+
+from py_mac import MAC50Motor as mac
+from py_mac.MAC50Motor import OperatingMode
+
+
+def test_plan_reads_packs_neighbouring_registers():
+    # two 2-byte registers share a window, the 4-byte one starts the next window
+    plan = mac._plan_reads([(12, 2, False), (10, 4, True), (13, 2, True), (20, 2, False)])
+    assert plan == [(10, "<i", [1]), (12, "<Hh", [0, 2]), (20, "<H", [3])]
+
+    windows = [struct.pack("<i", -7), struct.pack("<Hh", 3, -4), struct.pack("<Hxx", 9)]
+    assert mac._decode_reads(plan, windows, 4) == [3, -7, -4, 9]
+
+
+def test_plan_reads_skips_the_gap_in_a_window():
+    assert mac._plan_reads([(5, 2, False), (6, 2, False)]) == [(5, "<HH", [0, 1])]
+    assert mac._plan_reads([(5, 2, False), (7, 2, False)]) == [(5, "<H", [0]), (7, "<H", [1])]
+
+
+def test_happy_path(bus, motor):
+    assert motor.status["operating mode"] == OperatingMode.POSITION
+    assert motor.status["actual position"] == -5
+    assert motor.config["starting mode"] == OperatingMode.PASSIVE
+
+    bus.set(10, 4, 1234)
+    assert motor.get_position() == 1234
+    assert motor.read_register("p_ist", signed=True) == 1234
+
+    motor.set_target_position(-300)
+    assert bus.get(3, 4, signed=True) == -300
+    assert motor.status["target position"] == -300
+    # the motor may have changed its target on its own, so the same target is sent again
+    bus.set(3, 4, 0)
+    motor.set_target_position(-300)
+    assert bus.get(3, 4, signed=True) == -300
+
+    motor.set_mode("velocity")
+    assert bus.get(2, 2) == OperatingMode.VELOCITY.value
+    assert motor.get_mode() == OperatingMode.VELOCITY
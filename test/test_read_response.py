@@ -0,0 +1,16 @@
+import pytest
+
+
+def test_check_read_response(bus, motor):
+    response = bus.answer(motor._read_frames[10])
+    assert motor._check_read_response(response, 10) == bytes(bus.memory(1)[20:24])
+
+    with pytest.raises(ValueError, match="Invalid register"):
+        motor._check_read_response(response, 11)
+    for index, error in ((0, "Invalid frame"), (3, "Invalid address"), (10, "Invalid complement")):
+        corrupted = bytearray(response)
+        corrupted[index] ^= 0x01
+        with pytest.raises(ValueError, match=error):
+            motor._check_read_response(bytes(corrupted), 10)
+    with pytest.raises(ValueError, match="Invalid frame"):
+        motor._check_read_response(response[:-1], 10)
@@ -0,0 +1,21 @@
+import time
+
+import pytest
+
+
+def test_garbage_before_the_answer_is_skipped(bus, motor):
+    port = bus.ports[0]
+    sent = len(port.frames)
+    bus.garbage = b"\x00\x52\x01"
+    bus.set(10, 4, 42)
+    assert motor.get_position() == 42
+    assert len(port.frames) == sent + 1
+
+
+def test_flooded_port_gives_up(bus, motor):
+    # about a second of bytes that are not an answer
+    bus.garbage = bytes(2000)
+    start = time.monotonic()
+    with pytest.raises(ValueError):
+        motor.get_position()
+    assert time.monotonic() - start < 0.6
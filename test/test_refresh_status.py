@@ -0,0 +1,15 @@
+import pytest
+
+
+def test_refresh_status_fields(bus, motor):
+    port = bus.ports[0]
+    bus.set(10, 4, 77)
+    bus.set(3, 4, 88)
+    sent = len(port.frames)
+    motor.refresh_status(["actual position"])
+    assert len(port.frames) == sent + 1
+    assert motor.status["actual position"] == 77
+    assert motor.status["target position"] != 88
+
+    with pytest.raises(ValueError, match="Invalid field"):
+        motor.refresh_status(["nope"])
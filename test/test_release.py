@@ -0,0 +1,49 @@
+from concurrent.futures import Future
+import gc
+
+import pytest
+
+from py_mac.MAC50Motor import MAC50Motor
+
+
+def test_collected_motor_releases_the_port(bus):
+    motor = MAC50Motor("/dev/fake", 1)
+    io_thread = motor._io_thread
+    del motor
+    gc.collect()
+    io_thread.join(1)
+    assert not io_thread.is_alive()
+    assert not bus.ports[0].is_open
+
+
+def test_close_with_pending_writes(bus):
+    motor = MAC50Motor("/dev/fake", 1)
+    port = bus.ports[0]
+    sent = len(port.frames)
+    for position in range(5):
+        motor.write_fire_and_forget(3, position.to_bytes(4, "little"))
+    motor.close()
+
+    assert len(port.frames) == sent + 5
+    assert bus.get(3, 4) == 4
+    assert not port.is_open
+    with pytest.raises(ValueError, match="Motor is closed"):
+        motor.read(3)
+    motor.close()
+
+
+def test_request_queued_behind_close_is_answered(bus):
+    motor = MAC50Motor("/dev/fake", 1)
+    future = Future()
+    put = motor._tx_queue.put
+
+    def put_late_request(request):
+        put(request)
+        if request is None:
+            # as if another thread queued a read right after close told the serial thread to stop
+            put((motor._read_transaction, 10, future))
+
+    motor._tx_queue.put = put_late_request
+    motor.close()
+    with pytest.raises(ValueError, match="Motor is closed"):
+        future.result(timeout=1)
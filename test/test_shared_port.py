@@ -0,0 +1,8 @@
+from py_mac.MAC50Motor import MAC50Motor
+
+
+def test_motors_share_the_port(bus, motor):
+    with MAC50Motor("/dev/fake", 2) as other:
+        assert other.serial is motor.serial
+        assert len(bus.ports) == 1
+    assert bus.ports[0].is_open
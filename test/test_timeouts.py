@@ -0,0 +1,20 @@
+from py_mac.MAC50Motor import MAC50Motor
+
+
+def test_default_usb_latency(bus):
+    bus.low_latency_supported = False
+    bus.usb_latency = 0.016
+    with MAC50Motor("/dev/fake", 1) as motor:
+        port = bus.ports[0]
+        sent = len(port.frames)
+        for position in (111, 222, 333):
+            bus.set(10, 4, position)
+            assert motor.get_position() == position
+        # no request had to be sent again
+        assert len(port.frames) == sent + 3
+
+
+def test_long_write(bus, motor):
+    data = bytes(range(100))
+    motor.write(100, data)
+    assert bytes(bus.memory(1)[200:300]) == data